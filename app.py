@@ -6,6 +6,7 @@ import os
 import plotly.express as px
 from page import map
 from utils.gee_auth import auth_gee
+from utils.regions import REGIONS, find_region
 from st_on_hover_tabs import on_hover_tabs
 from page import home as home_page
 from page import map as map_page  # Import fungsi dari pages
@@ -86,6 +87,22 @@ with st.sidebar:
     )
     st.markdown("---")
 
+    # Region selection, preselected from ?lat=..&lon=.. when the point falls inside a region
+    region_keys = REGIONS.keys()
+    default_region = 0
+    try:
+        located = find_region(float(st.query_params["lon"]), float(st.query_params["lat"]))
+        if located is not None:
+            default_region = region_keys.index(located.key)
+    except (KeyError, ValueError):
+        pass
+    selected_region = st.selectbox(
+        "Region",
+        region_keys,
+        index=default_region,
+        format_func=lambda key: REGIONS.get(key).name
+    )
+
     # Konten atas menu, berbeda tiap halaman
     if tabs == "Home":
         st.success("""
@@ -118,6 +135,6 @@ with st.sidebar:
 
 # Konten utama
 if tabs == "Home":
-    home_page.show_home()
+    home_page.show_home(selected_region)
 elif tabs == "Map":
-    map_page.show_map(selected_year, selected_palette)
\ No newline at end of file
+    map_page.show_map(selected_year, selected_palette, selected_region)
\ No newline at end of file
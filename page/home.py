@@ -1,10 +1,14 @@
+import math
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 import ee
 import geemap.foliumap as geemap
+from utils.regions import get_region
+
+def show_home(region_key):
+    region = get_region(region_key)
 
-def show_home():
     st.markdown("""
     <style>
     html, body, [class*="css"], .main, div, p, h1, h2, h3, h4, h5, h6, span, button, input {
@@ -14,13 +18,13 @@ def show_home():
     </style>
     """, unsafe_allow_html=True)
 
-    st.markdown("""
+    st.markdown(f"""
     <div class="main-header">
         <h2 style="margin: 0; text-align: center;">
-            Aboveground Biomass Monitor System<br> for Tanjung Puting National Park
+            Aboveground Biomass Monitor System<br> for {region.name}
         </h2>
         <h5 style="margin: 0 0 1rem 0; text-align: center; "font-family: 'Onest', sans-serif;">
-            Central Kalimantan, Indonesia
+            {region.province}, {region.country}
         </h5>
     </div>
     """, unsafe_allow_html=True)
@@ -28,13 +32,13 @@ def show_home():
     # Main content in columns
     col1, col2 = st.columns([2.5, 1])
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         <div class="info-card">
             <h3 style="color: #ffffff";>
                 About BIOMASSBRO</h3>
             <p style="font-size: 1.1rem; line-height: 1.6;">
                 <br>This biomass monitoring system uses Random Forest Machine Learning to estimate
-                 aboveground biomass density in the <strong>Tanjung Puting National Park area</strong>.
+                 aboveground biomass density in the <strong>{region.name} area</strong>.
             </p>
             <p style="font-size: 1.1rem; line-height: 1.6;">
                 This project aims to support forest conservation and monitor land cover changes using 
@@ -50,7 +54,7 @@ def show_home():
         
         # Sample metrics (replace with real data)
         metrics = [
-            ("Area Coverage", "400,000+ Ha", "#ffffff"),
+            ("Area Coverage", format_area(region.area_ha), "#ffffff"),
             # ("Data Points", "10,000+", "#ffffff"),
             ("Model Accuracy", "80%+", "#ffffff"),
             ("Year Analyzed", "2021-2023", "#ffffff")
@@ -138,8 +142,8 @@ def show_home():
     st.markdown("### Biomass Trend")
 
     # 1. Load data dari GEE
-    agb_2021 = load_layer('projects/ee-sorayatriutami/assets/agb/agb_2021')
-    agb_trend = load_layer('projects/ee-sorayatriutami/assets/agb/agb_trend')
+    agb_2021 = load_layer(region.asset('agb_2021'))
+    agb_trend = load_layer(region.asset('agb_trend'))
 
     # 2. Parameter visualisasi yang sesuai dengan GEE
     vis_params_agb_2021 = {
@@ -157,7 +161,7 @@ def show_home():
     }
 
     # 3. Buat peta split-panel
-    Map = geemap.Map(center=[-3.05, 112], zoom=10)
+    Map = geemap.Map(center=list(region.center), zoom=10)
     
     # Tambahkan layer dengan parameter visualisasi
     left_layer = geemap.ee_tile_layer(agb_2021, vis_params_agb_2021, 'AGB 2021')
@@ -189,6 +193,14 @@ def show_home():
     """, unsafe_allow_html=True)
 
 
+def format_area(area_ha):
+    """Area rounded down to 2 significant figures, e.g. 594,810 -> '590,000+ Ha'"""
+    if area_ha < 1:
+        return "<1 Ha"
+    step = 10 ** max(int(math.floor(math.log10(area_ha))) - 1, 0)
+    return f"{area_ha // step * step:,.0f}+ Ha"
+
+
 def load_layer(asset_id):
     try:
         return ee.Image(asset_id)
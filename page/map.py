@@ -4,9 +4,15 @@ import plotly.express as px
 import plotly.graph_objects as go
 import altair as alt
 import pandas as pd
+import numpy as np
 import ee
+from utils.regions import get_region
+from utils.accuracy import accuracy_metrics, binned_errors, bootstrap_ci, density_bins
+from utils.export import export_agb_geotiff, stats_table, to_csv_bytes, to_parquet_bytes
+
+def show_map(year, color_palette, region_key):
+    region = get_region(region_key)
 
-def show_map(year, color_palette):
     st.markdown("""
     <style>
     html, body, [class*="css"], .main, div, p, h1, h2, h3, h4, h5, h6, span, button, input {
@@ -16,30 +22,21 @@ def show_map(year, color_palette):
     </style>
     """, unsafe_allow_html=True)
 
-    st.markdown("""
+    st.markdown(f"""
     <div class="main-header">
         <h2 style="margin: 0; text-align: center;">
             Aboveground Biomass Estimator Map
         </h2>
         <h5 style="margin: 0 0 1rem 0; text-align: center; font-family: 'Onest', sans-serif;">
-            Tanjung Puting National Park, Indonesia
+            {region.name}, {region.country}
         </h5>
     </div>
     """, unsafe_allow_html=True)
 
-    # Get feature collections
-    try:
-        AGBP_per_year_fc = ee.FeatureCollection('projects/ee-sorayatriutami/assets/agb/AGBP_per_year')
-        AGBP_Diff_per_year_fc = ee.FeatureCollection('projects/ee-sorayatriutami/assets/agb/AGBP_Diff_per_year')
-        RMSE_per_year_fc = ee.FeatureCollection('projects/ee-sorayatriutami/assets/agb/RMSE_per_year')
-    except Exception as e:
-        st.error(f"Error loading FeatureCollections: {str(e)}")
-        return
-
-    # Convert to dataframes
-    AGBP_per_year = fc_to_df(AGBP_per_year_fc, ['year', 'total_agb'])
-    AGBP_Diff_per_year = fc_to_df(AGBP_Diff_per_year_fc, ['year', 'change'])
-    RMSE_per_year = fc_to_df(RMSE_per_year_fc, ['year', 'rmse'])
+    # Load per-region tables
+    AGBP_per_year = load_table(region_key, 'AGBP_per_year', ['year', 'total_agb'])
+    AGBP_Diff_per_year = load_table(region_key, 'AGBP_Diff_per_year', ['year', 'change'])
+    RMSE_per_year = load_table(region_key, 'RMSE_per_year', ['year', 'rmse'])
 
     # Get palette colors
     palettes = {
@@ -64,7 +61,7 @@ def show_map(year, color_palette):
     with col1:
         # Interactive Map
         # st.subheader(f"Aboveground Biomass Distribution {year}")
-        display_map(year, palettes[color_palette])
+        display_map(region_key, year, palettes[color_palette])
     
     with col2:
         # Top: Statistics
@@ -86,7 +83,7 @@ def show_map(year, color_palette):
         </style>
         """, unsafe_allow_html=True)
         
-        display_stats(year)
+        display_stats(region_key, year)
         
         st.markdown("<br>", unsafe_allow_html=True)
         
@@ -95,7 +92,7 @@ def show_map(year, color_palette):
         
         # Load observed vs predicted data for the year
         try:
-            obs_pred_df = load_observed_vs_predicted(year)
+            obs_pred_df = load_observed_vs_predicted(region_key, year)
             rmse_row = RMSE_per_year[RMSE_per_year['year'] == year]
             
             if not rmse_row.empty and not obs_pred_df.empty:
@@ -155,10 +152,10 @@ def show_map(year, color_palette):
     """, unsafe_allow_html=True)
 
     # Tab navigasi
-    tab1, tab2 = st.tabs(["Total Aboveground Biomass", "Model RMSE"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Total Aboveground Biomass", "Model RMSE", "Model Accuracy", "Observed vs Predicted"])
 
     with tab1:
-        st.subheader("Total Aboveground Biomass 2021 - 2023", help= "The total mass of living vegetation above the ground surface within Tanjung Puting area")
+        st.subheader("Total Aboveground Biomass 2021 - 2023", help= f"The total mass of living vegetation above the ground surface within {region.name} area")
         col1, col2 = st.columns([1,1])
         with col1:
             if not AGBP_per_year.empty:
@@ -228,6 +225,71 @@ def show_map(year, color_palette):
             else:
                 st.warning("Data RMSE tidak tersedia.")
 
+    with tab3:
+        st.subheader(f"Model Accuracy {year}",
+                     help= "Errors of predicted against observed AGB with 95% bootstrap confidence intervals.")
+        accuracy = compute_accuracy(region_key, year)
+        if accuracy is not None:
+            metrics, ci, bins = accuracy
+            col1, col2 = st.columns([1,1])
+            with col1:
+                ci_table = ci.rename(
+                    index={'rmse': 'RMSE (Ton/Ha)', 'mae': 'MAE (Ton/Ha)', 'bias': 'Bias (Ton/Ha)', 'r2': 'R²'},
+                    columns={'estimate': 'Estimate', 'lower': 'Lower 95%', 'upper': 'Upper 95%'}
+                )
+                st.dataframe(ci_table.style.format('{:.3f}'), use_container_width=True)
+                st.caption(f"{metrics['n']:,} validation points")
+            with col2:
+                fig3 = px.bar(
+                    bins.melt(id_vars=['bin', 'n'], value_vars=['rmse', 'bias'], var_name='metric'),
+                    x='bin', y='value', color='metric', barmode='group',
+                    labels={'bin': 'Observed AGB (Ton/Ha)', 'value': 'Error (Ton/Ha)', 'metric': ''},
+                    color_discrete_map={'rmse': '#9ACD32', 'bias': '#E74C3C'},
+                    hover_data=['n'],
+                    title=' '
+                )
+                fig3.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white', size=18),
+                    title=dict(font=dict(size=24)),
+                    xaxis=dict(
+                        type='category',
+                        showgrid=False,
+                        tickfont=dict(size=16),
+                        title=dict(font=dict(size=18))
+                    ),
+                    yaxis=dict(
+                        showgrid=False,
+                        tickfont=dict(size=16),
+                        title=dict(font=dict(size=18))
+                    ),
+                    height=350,
+                    margin=dict(l=30, r=30, t=40, b=30)
+                )
+                st.plotly_chart(fig3, use_container_width=True)
+        else:
+            st.warning("Data observed vs predicted tidak tersedia.")
+
+    with tab4:
+        st.subheader(f"Observed vs Predicted {year}",
+                     help= "Density of validation points binned on a grid; the dashed line marks a perfect prediction.")
+        col1, col2 = st.columns([1,1])
+        with col1:
+            density = compute_density(region_key, year)
+            if density is not None:
+                st.plotly_chart(make_density_plot(*density), use_container_width=True)
+            else:
+                st.warning("Data observed vs predicted tidak tersedia.")
+
+    st.markdown("---")
+    st.subheader("Download Data")
+    col1, col2 = st.columns([1,1])
+    with col1:
+        display_raster_export(region_key, year)
+    with col2:
+        display_stats_export(region_key, [AGBP_per_year, AGBP_Diff_per_year, RMSE_per_year])
+
     st.markdown("""
     <div style="text-align: center; margin-top: 3rem; padding: 2rem; 
                 background-color: rgba(60, 90, 60, 0.25); border-radius: 0px;">
@@ -240,10 +302,9 @@ def show_map(year, color_palette):
     """, unsafe_allow_html=True)
     
 # --- FeatureCollection to DataFrame ---
-@st.cache_data
-def fc_to_df(_feature_collection, properties):
+def fc_to_df(feature_collection, properties):
     try:
-        features = _feature_collection.getInfo()['features']
+        features = feature_collection.getInfo()['features']
         data = [{prop: f['properties'].get(prop, None) for prop in properties} for f in features]
         df = pd.DataFrame(data)
         return df
@@ -251,98 +312,77 @@ def fc_to_df(_feature_collection, properties):
         st.error(f"Error converting FeatureCollection to DataFrame: {str(e)}")
         return pd.DataFrame()
 
+def fc_to_df_paged(feature_collection, properties):
+    """fc_to_df for collections past getInfo's 5000-feature limit, fetched page by page"""
+    try:
+        df = ee.data.computeFeatures({
+            'expression': feature_collection.select(properties, None, False),
+            'fileFormat': 'PANDAS_DATAFRAME'
+        })
+        return df.reindex(columns=properties)
+    except Exception as e:
+        st.error(f"Error converting FeatureCollection to DataFrame: {str(e)}")
+        return pd.DataFrame()
+
+# --- Region-keyed tables ---
+@st.cache_data
+def load_table(region_key, name, properties):
+    try:
+        fc = ee.FeatureCollection(get_region(region_key).asset(name))
+        return fc_to_df(fc, properties)
+    except Exception as e:
+        st.error(f"Error loading {name}: {str(e)}")
+        return pd.DataFrame()
+
 # --- Year-specific FeatureCollections ---
 @st.cache_data
-def load_agb(year: int):
+def load_agb(region_key, year: int):
     try:
-        asset_id = f'projects/ee-sorayatriutami/assets/agb/agb_{year}'
+        asset_id = get_region(region_key).asset(f'agb_{year}')
         return ee.Image(asset_id).select('agbd')
     except Exception as e:
         st.error(f"Error loading AGB data for year {year}: {str(e)}")
         return None
 
 @st.cache_data
-def load_observed_vs_predicted(year):
+def load_observed_vs_predicted(region_key, year):
     try:
-        fc = ee.FeatureCollection(f'projects/ee-sorayatriutami/assets/agb/Observed_vs_Predicted_{year}')
-        return fc_to_df(fc, ['agbd', 'agbd_predicted'])
+        fc = ee.FeatureCollection(get_region(region_key).asset(f'Observed_vs_Predicted_{year}'))
+        return fc_to_df_paged(fc, ['agbd', 'agbd_predicted'])
     except Exception as e:
         st.error(f"Error loading observed vs predicted data for year {year}: {str(e)}")
         return pd.DataFrame()
 
 @st.cache_data
-def get_tanjung_puting_geometry():
-    return ee.Geometry.Polygon(
-        [[[111.88610442456644, -2.634969034682339],
-        [111.89125426587503, -2.655546449659222],
-        [111.90876372632425, -2.6850401460514184],
-        [111.89331420239847, -2.7049308420876907],
-        [111.89606078442972, -2.7176195640997145],
-        [111.88679107007425, -2.7258500152053013],
-        [111.89331420239847, -2.7601429536574984],
-        [111.86001189526957, -2.792034498640716],
-        [111.84730895337503, -2.7807182425493235],
-        [111.82430632886332, -2.791348668036572],
-        [111.78379424390238, -2.794091988050556],
-        [111.78001769360941, -2.800264434634048],
-        [111.79203398999613, -2.8174099487121724],
-        [111.785167534918, -2.838327133809131],
-        [111.75838836011332, -2.8379842321801423],
-        [111.75529845532816, -2.830097466660325],
-        [111.75941832837503, -2.8108946830231907],
-        [111.71272643384378, -2.77694613303973],
-        [111.70208342847269, -2.7790036488120053],
-        [111.70311339673441, -2.8095230435033094],
-        [111.72268279370707, -2.8225535537691324],
-        [111.7273823921613, -3.2221912287192493],
-        [111.61477252888005, -3.2194489851511228],
-        [111.62033831194752, -3.6005620583326463],
-        [112.19162737444752, -3.5950797206625347],
-        [112.19986712054127, -3.2420871034107583],
-        [112.3001173646819, -3.243458195531875],
-        [112.26990496233815, -3.207809198385169],
-        [112.25023871982027, -3.206395602312007],
-        [112.2571051748984, -3.176230053218437],
-        [112.2406256827109, -3.033617484950588],
-        [112.22002631747652, -2.892357644516766],
-        [112.18294746005465, -2.844352678960637],
-        [112.13788608216097, -2.7840007481915663],
-        [112.13033298157504, -2.7593104271303273],
-        [112.11385348938754, -2.759996276327663],
-        [112.04114594826174, -2.5469780477290866],
-        [112.02432313332034, -2.5469780477290866],
-        [111.95771851906252, -2.546292080361117],
-        [111.9505087412305, -2.5425192533115304],
-        [111.94398560890627, -2.547321031276085],
-        [111.9292227304883, -2.572358582696896],
-        [111.92973771461916, -2.576817273307101],
-        [111.92699113258791, -2.5783606625738598],
-        [111.9292227304883, -2.585563121046636],
-        [111.92441621193362, -2.5884783902399673],
-        [111.92613282570315, -2.591736624343633],
-        [111.9233862436719, -2.593965937582822],
-        [111.92544618019534, -2.597224157554991],
-        [111.9175497568555, -2.593451481030129],
-        [111.92098298439456, -2.599967915223642],
-        [111.91136994728518, -2.597567127589645],
-        [111.9123999155469, -2.6047694767833836],
-        [111.90484681496096, -2.602711666925904],
-        [111.90484681496096, -2.610599919778431],
-        [111.89523377785159, -2.614029579495644],
-        [111.89832368263674, -2.621917761255445],
-        [111.88768067726565, -2.6318636586595057]]]
+def compute_accuracy(region_key, year):
+    """Metrics, bootstrap intervals and per-bin errors for one year, or None without data"""
+    obs_pred_df = load_observed_vs_predicted(region_key, year)
+    if obs_pred_df.empty:
+        return None
+    observed = obs_pred_df['agbd']
+    predicted = obs_pred_df['agbd_predicted']
+    return (
+        accuracy_metrics(observed, predicted),
+        bootstrap_ci(observed, predicted),
+        binned_errors(observed, predicted)
     )
 
-def display_map(year, palette):
+@st.cache_data
+def compute_density(region_key, year, n_bins=60):
+    """Binned observed vs predicted counts for one year, or None without data"""
+    obs_pred_df = load_observed_vs_predicted(region_key, year)
+    if obs_pred_df.empty:
+        return None
+    return density_bins(obs_pred_df['agbd'], obs_pred_df['agbd_predicted'], n_bins)
+
+def display_map(region_key, year, palette):
     try:
-        agb_layer = load_agb(year)
+        agb_layer = load_agb(region_key, year)
         if agb_layer is None:
             st.error(f"AGB data for {year} not available")
             return
             
-        # Tanjung Puting center coordinates
-        center_lat = -3.05
-        center_lon = 112.0435
+        center_lat, center_lon = get_region(region_key).center
         
         vis_params = {
             'min': 0,
@@ -359,26 +399,30 @@ def display_map(year, palette):
     except Exception as e:
         st.error(f"Error displaying map: {str(e)}")
 
-def display_stats(year):
+@st.cache_data
+def compute_region_stats(region_key, year, scale=100):
+    """Mean/min/max AGB over the region outline simplified to `scale`"""
+    agb_layer = load_agb(region_key, year)
+    if agb_layer is None:
+        return None
+    return agb_layer.reduceRegion(
+        reducer=ee.Reducer.mean().combine(
+            ee.Reducer.min(), '', True
+        ).combine(
+            ee.Reducer.max(), '', True
+        ),
+        geometry=get_region(region_key).geometry(scale),
+        scale=scale,
+        maxPixels=1e10
+    ).getInfo()
+
+def display_stats(region_key, year):
     """Display statistics for selected year"""
     try:
-        agb_layer = load_agb(year)
-        if agb_layer is None:
+        stats = compute_region_stats(region_key, year)
+        if stats is None:
             st.error(f"AGB data for {year} not available")
             return
-            
-        geometry = get_tanjung_puting_geometry()
-        
-        stats = agb_layer.reduceRegion(
-            reducer=ee.Reducer.mean().combine(
-                ee.Reducer.min(), '', True
-            ).combine(
-                ee.Reducer.max(), '', True
-            ),
-            geometry=geometry,
-            scale=100,
-            maxPixels=1e10
-        ).getInfo()
         
         st.metric(label=f"Average AGB {year}", 
                   value=f"{stats.get('agbd_mean', 0):.1f} Ton/ha",
@@ -387,6 +431,88 @@ def display_stats(year):
     except Exception as e:
         st.error(f"Error calculating stats: {str(e)}")
 
+def display_raster_export(region_key, year):
+    """Build the clipped AGB GeoTIFF on request and offer it for download"""
+    region = get_region(region_key)
+    scale = st.selectbox("Resolution (m)", [100, 250, 500], index=0)
+    state_key = f"agb_export_{region_key}_{year}_{scale}"
+
+    if st.button(f"Prepare AGB {year} GeoTIFF"):
+        try:
+            with st.spinner("Downloading and mosaicking tiles..."):
+                st.session_state[state_key] = export_agb_geotiff(region, year, scale)
+        except Exception as e:
+            st.error(f"Error exporting AGB raster: {str(e)}")
+
+    path = st.session_state.get(state_key)
+    if path:
+        with open(path, 'rb') as f:
+            st.download_button(
+                f"Download AGB {year} GeoTIFF",
+                data=f,
+                file_name=f"{region_key}_agb_{year}_{scale}m.tif",
+                mime="image/tiff"
+            )
+
+def display_stats_export(region_key, tables):
+    """Offer the per-year statistics as CSV and Parquet"""
+    stats = stats_table(tables)
+    if stats is None:
+        st.warning("Data statistik tidak tersedia.")
+        return
+
+    st.dataframe(stats, use_container_width=True, hide_index=True)
+    st.download_button(
+        "Download statistics (CSV)",
+        data=to_csv_bytes(stats),
+        file_name=f"{region_key}_agb_stats.csv",
+        mime="text/csv"
+    )
+    try:
+        st.download_button(
+            "Download statistics (Parquet)",
+            data=to_parquet_bytes(stats),
+            file_name=f"{region_key}_agb_stats.parquet",
+            mime="application/octet-stream"
+        )
+    except ImportError as e:
+        st.info(f"Parquet export unavailable: {str(e)}")
+
+def make_density_plot(centers, counts):
+    # Empty bins stay transparent instead of taking the lowest color
+    z = np.where(counts > 0, counts, np.nan)
+    fig = go.Figure(go.Heatmap(
+        x=centers, y=centers, z=z,
+        colorscale='Greens', reversescale=True,
+        colorbar=dict(title='Points'),
+        hovertemplate='Observed %{x:.0f}<br>Predicted %{y:.0f}<br>Points %{z}<extra></extra>'
+    ))
+    lo, hi = float(centers[0]), float(centers[-1])
+    fig.add_trace(go.Scatter(
+        x=[lo, hi], y=[lo, hi], mode='lines',
+        line=dict(color='#ffffff', dash='dash', width=1.5),
+        hoverinfo='skip', showlegend=False
+    ))
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white', size=18),
+        xaxis=dict(
+            showgrid=False,
+            tickfont=dict(size=16),
+            title=dict(text='Observed AGB (Ton/Ha)', font=dict(size=18))
+        ),
+        yaxis=dict(
+            showgrid=False,
+            tickfont=dict(size=16),
+            title=dict(text='Predicted AGB (Ton/Ha)', font=dict(size=18)),
+            scaleanchor='x'
+        ),
+        height=450,
+        margin=dict(l=30, r=30, t=40, b=30)
+    )
+    return fig
+
 def make_donut(error_pct):
     source = pd.DataFrame({
         "category": ['Error', 'Accuracy'],
@@ -1,2 +1,2 @@
-from page.home import show_home
-from page.map import show_map
+from utils.gee_auth import auth_gee
+from utils.regions import REGIONS, get_region, find_region
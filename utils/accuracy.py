@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+METRICS = ['rmse', 'mae', 'bias', 'r2']
+
+# Observed AGB bin edges (Ton/Ha) for per-bin errors
+AGB_BINS = (0, 50, 100, 150, 200, 300, np.inf)
+
+# Max resample x sample index entries held in memory per bootstrap chunk
+BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000
+
+# Below this many resample x sample entries the serial path is used. Each call
+# starts a fresh pool whose workers re-import utils (and so streamlit and ee),
+# roughly 2 s of startup; the serial path does ~40M entries a second. The value
+# is a conservative guess, not yet measured against that startup on multi-core hosts
+PARALLEL_MIN_ELEMENTS = 50_000_000
+
+# Worker cap, the app runs on a shared server
+MAX_BOOTSTRAP_WORKERS = 4
+
+
+def _available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _pool_context():
+    # Never fork the multi-threaded Streamlit server
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+def clean_pairs(observed, predicted):
+    """Float arrays with pairs containing a missing value dropped"""
+    observed = np.asarray(observed, dtype=float)
+    predicted = np.asarray(predicted, dtype=float)
+    valid = np.isfinite(observed) & np.isfinite(predicted)
+    return observed[valid], predicted[valid]
+
+
+def _metrics(observed, predicted):
+    """Metrics along the last axis, so a 2D input gives one row per resample"""
+    residual = predicted - observed
+    ss_res = np.sum(residual ** 2, axis=-1)
+    ss_tot = np.sum((observed - observed.mean(axis=-1, keepdims=True)) ** 2, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.nan)
+    return np.stack([
+        np.sqrt(ss_res / residual.shape[-1]),
+        np.abs(residual).mean(axis=-1),
+        residual.mean(axis=-1),
+        r2,
+    ], axis=-1)
+
+
+def accuracy_metrics(observed, predicted):
+    observed, predicted = clean_pairs(observed, predicted)
+    if observed.size == 0:
+        return {metric: np.nan for metric in METRICS} | {'n': 0}
+    values = _metrics(observed, predicted)
+    return {metric: float(v) for metric, v in zip(METRICS, values)} | {'n': int(observed.size)}
+
+
+def binned_errors(observed, predicted, edges=AGB_BINS):
+    """RMSE, MAE and bias per observed-AGB bin"""
+    observed, predicted = clean_pairs(observed, predicted)
+    edges = np.asarray(edges, dtype=float)
+    n_bins = len(edges) - 1
+    bins = np.clip(np.digitize(observed, edges) - 1, 0, n_bins - 1)
+    residual = predicted - observed
+
+    count = np.bincount(bins, minlength=n_bins)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rmse = np.sqrt(np.bincount(bins, residual ** 2, n_bins) / count)
+        mae = np.bincount(bins, np.abs(residual), n_bins) / count
+        bias = np.bincount(bins, residual, n_bins) / count
+
+    labels = [
+        f'{lo:g}+' if np.isinf(hi) else f'{lo:g}-{hi:g}'
+        for lo, hi in zip(edges[:-1], edges[1:])
+    ]
+    return pd.DataFrame({'bin': labels, 'n': count, 'rmse': rmse, 'mae': mae, 'bias': bias})
+
+
+# Worker state, set once per process so the arrays are not pickled per task
+_observed = None
+_predicted = None
+
+
+def _init_worker(observed, predicted):
+    global _observed, _predicted
+    _observed, _predicted = observed, predicted
+
+
+def _bootstrap_chunk(n_resamples, seed_sequence):
+    rng = np.random.default_rng(seed_sequence)
+    idx = rng.integers(0, _observed.size, size=(n_resamples, _observed.size))
+    return _metrics(_observed[idx], _predicted[idx])
+
+
+def _chunk_sizes(n_resamples, n_samples):
+    per_chunk = max(1, BOOTSTRAP_CHUNK_ELEMENTS // max(n_samples, 1))
+    sizes = [per_chunk] * (n_resamples // per_chunk)
+    if n_resamples % per_chunk:
+        sizes.append(n_resamples % per_chunk)
+    return sizes
+
+
+def bootstrap_ci(observed, predicted, n_resamples=1000, confidence=0.95, seed=42, workers=None):
+    """Percentile bootstrap intervals for each metric
+
+    Resamples are split into fixed-size chunks, each with its own child of
+    `seed`, so results are identical whatever the number of workers.
+    """
+    observed, predicted = clean_pairs(observed, predicted)
+    if observed.size < 2:
+        return pd.DataFrame(
+            {'estimate': np.nan, 'lower': np.nan, 'upper': np.nan}, index=METRICS
+        )
+
+    sizes = _chunk_sizes(n_resamples, observed.size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers is None:
+        workers = MAX_BOOTSTRAP_WORKERS
+    workers = min(workers, _available_cpus(), len(sizes))
+
+    if workers > 1 and n_resamples * observed.size >= PARALLEL_MIN_ELEMENTS:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=_pool_context(),
+            initializer=_init_worker,
+            initargs=(observed, predicted)
+        ) as pool:
+            chunks = list(pool.map(_bootstrap_chunk, sizes, seeds))
+    else:
+        _init_worker(observed, predicted)
+        chunks = [_bootstrap_chunk(size, s) for size, s in zip(sizes, seeds)]
+        _init_worker(None, None)
+
+    samples = np.concatenate(chunks)
+    alpha = (1 - confidence) / 2
+    lower, upper = np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+    return pd.DataFrame({
+        'estimate': _metrics(observed, predicted),
+        'lower': lower,
+        'upper': upper,
+    }, index=METRICS)
+
+
+def density_bins(observed, predicted, n_bins=60):
+    """2D histogram of observed vs predicted on a shared square range
+
+    Returns bin centers and a (predicted, observed) count matrix, so the
+    payload is n_bins² however many points there are.
+    """
+    observed, predicted = clean_pairs(observed, predicted)
+    upper = max(observed.max(initial=0), predicted.max(initial=0)) or 1.0
+    lower = min(observed.min(initial=0), predicted.min(initial=0))
+    edges = np.linspace(lower, upper, n_bins + 1)
+    counts, _, _ = np.histogram2d(predicted, observed, bins=[edges, edges])
+    centers = (edges[:-1] + edges[1:]) / 2
+    return centers, counts.astype(np.int64)
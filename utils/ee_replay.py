@@ -0,0 +1,156 @@
+"""Record/replay of Earth Engine API traffic
+
+Fixtures are meant to be safe to commit and share: only requests to Earth
+Engine API hosts are recorded (OAuth token exchanges and other traffic
+pass straight through), and API keys and access tokens are stripped from
+the stored URIs.
+"""
+import base64
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import shutil
+import urllib.request
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httplib2
+
+# live: plain network, record: network + save responses, replay: saved responses only
+MODE_ENV = 'EE_TRANSPORT_MODE'
+STORE_ENV = 'EE_FIXTURES_DIR'
+DEFAULT_STORE = 'fixtures/ee'
+
+# Project id sent with replayed requests; keys ignore it so any value works
+REPLAY_PROJECT = 'biomasswatch-replay'
+
+# Hosts whose responses are recorded and replayed
+RECORDED_HOSTS = ('earthengine*.googleapis.com',)
+
+# Billing project prefix of computation endpoints; asset paths keep their owner project
+_BILLING_PROJECT_PATH = re.compile(
+    r'^(/v[^/]+)/projects/[^/]+/'
+    r'(?=value:|table:|image:|thumbnails|videoThumbnails|filmstripThumbnails|maps|algorithms)'
+)
+
+# Query parameters that vary between sessions without changing the response
+VOLATILE_PARAMS = {'key', 'access_token'}
+
+
+def transport_mode():
+    mode = os.environ.get(MODE_ENV, 'live').lower()
+    if mode not in ('live', 'record', 'replay'):
+        raise ValueError(f"{MODE_ENV} must be live, record or replay, got '{mode}'")
+    return mode
+
+
+def normalize_uri(uri):
+    """URI without the billing project and volatile query parameters, query sorted"""
+    parts = urlsplit(uri)
+    path = _BILLING_PROJECT_PATH.sub(r'\1/projects/_/', parts.path)
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in VOLATILE_PARAMS
+    ))
+    return f'{parts.scheme}://{parts.netloc}{path}?{query}'
+
+
+def is_recorded(uri):
+    host = urlsplit(uri).hostname or ''
+    return any(fnmatch.fnmatch(host, pattern) for pattern in RECORDED_HOSTS)
+
+
+def request_key(uri, method, body):
+    """Key a request by its serialized computation rather than by who sent it"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    digest = hashlib.sha256()
+    digest.update(method.upper().encode('utf-8'))
+    digest.update(normalize_uri(uri).encode('utf-8'))
+    digest.update(body or b'')
+    return digest.hexdigest()
+
+
+class RecordReplayHttp(httplib2.Http):
+    """httplib2 transport that records Earth Engine responses to, or replays them from, a directory"""
+
+    def __init__(self, mode, store=DEFAULT_STORE, **kwargs):
+        super().__init__(**kwargs)
+        self.mode = mode
+        self.store = store
+        os.makedirs(store, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.store, f'{key}.json')
+
+    def request(self, uri, method='GET', body=None, headers=None, *args, **kwargs):
+        if not is_recorded(uri):
+            return super().request(uri, method, body, headers, *args, **kwargs)
+
+        key = request_key(uri, method, body)
+        if self.mode == 'replay':
+            return self._replay(key, uri, method)
+
+        response, content = super().request(uri, method, body, headers, *args, **kwargs)
+        if 200 <= response.status < 300:
+            self._record(key, uri, method, response, content)
+        return response, content
+
+    def _record(self, key, uri, method, response, content):
+        entry = {
+            'method': method,
+            'uri': normalize_uri(uri),
+            'status': response.status,
+            'headers': {k: v for k, v in response.items() if k != 'status'},
+            'content': base64.b64encode(content or b'').decode('ascii'),
+        }
+        tmp_path = self._path(key) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp_path, self._path(key))
+
+    def _replay(self, key, uri, method):
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            raise LookupError(
+                f"No recorded Earth Engine response for {method} {uri} "
+                f"(key {key}); run once with {MODE_ENV}=record"
+            ) from None
+        response = httplib2.Response({**entry['headers'], 'status': str(entry['status'])})
+        return response, base64.b64decode(entry['content'])
+
+
+def make_transport(mode=None):
+    """Transport for ee.Initialize(http_transport=...), or None in live mode"""
+    mode = mode or transport_mode()
+    if mode == 'live':
+        return None
+    return RecordReplayHttp(mode, store=os.environ.get(STORE_ENV, DEFAULT_STORE))
+
+
+def download(url, path, key, timeout=None):
+    """Stream `url` to `path`; in record/replay mode the bytes go through the store under `key`
+
+    Download URLs are short-lived, so callers key by the request that
+    produced the URL rather than the URL itself.
+    """
+    mode = transport_mode()
+    fixture = os.path.join(os.environ.get(STORE_ENV, DEFAULT_STORE), 'downloads', f'{key}.bin')
+    if mode == 'replay':
+        if not os.path.exists(fixture):
+            raise LookupError(
+                f"No recorded download for key {key}; run once with {MODE_ENV}=record"
+            )
+        shutil.copyfile(fixture, path)
+        return path
+
+    with urllib.request.urlopen(url, timeout=timeout) as response, open(path, 'wb') as f:
+        shutil.copyfileobj(response, f)
+    if mode == 'record':
+        os.makedirs(os.path.dirname(fixture), exist_ok=True)
+        shutil.copyfile(path, fixture + '.tmp')
+        os.replace(fixture + '.tmp', fixture)
+    return path
@@ -0,0 +1,187 @@
+import hashlib
+import io
+import json
+import math
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import ee
+import numpy as np
+import rasterio
+from rasterio.transform import Affine
+from rasterio.windows import Window
+
+from utils.ee_replay import download
+from utils.regions import METERS_PER_DEGREE
+
+EXPORT_DIR_ENV = 'BIOMASSWATCH_EXPORT_DIR'
+DEFAULT_EXPORT_DIR = 'exports'
+
+# getDownloadURL rejects requests above 48 MiB; stay well under it
+MAX_TILE_BYTES = 32 * 1024 * 1024
+MAX_TILE_SIDE = 10000
+
+# Concurrent tile byte fetches; Earth Engine throttles beyond a few
+MAX_CONCURRENT_DOWNLOADS = 4
+
+DOWNLOAD_TIMEOUT = 300
+
+NODATA = -9999.0
+
+
+class Tile:
+    """Pixel window of the export grid fetched as one download"""
+
+    def __init__(self, col_off, row_off, width, height):
+        self.col_off = col_off
+        self.row_off = row_off
+        self.width = width
+        self.height = height
+
+    @property
+    def window(self):
+        return Window(self.col_off, self.row_off, self.width, self.height)
+
+
+def export_grid(bbox, scale):
+    """Pixel grid in EPSG:4326 covering `bbox`, snapped to multiples of the resolution"""
+    res = scale / METERS_PER_DEGREE
+    min_lon, min_lat, max_lon, max_lat = bbox
+    x0 = math.floor(min_lon / res) * res
+    y0 = math.ceil(max_lat / res) * res
+    width = math.ceil((max_lon - x0) / res)
+    height = math.ceil((y0 - min_lat) / res)
+    return Affine(res, 0, x0, 0, -res, y0), width, height
+
+
+def plan_tiles(width, height, bytes_per_pixel=4, max_bytes=MAX_TILE_BYTES):
+    side = min(MAX_TILE_SIDE, math.isqrt(max_bytes // bytes_per_pixel))
+    return [
+        Tile(col, row, min(side, width - col), min(side, height - row))
+        for row in range(0, height, side)
+        for col in range(0, width, side)
+    ]
+
+
+def asset_version(asset_id):
+    """Last update time of an asset, which changes whenever it is re-exported"""
+    return ee.data.getAsset(asset_id).get('updateTime', '')
+
+
+def region_hash(region):
+    return hashlib.sha256(json.dumps(region.coordinates).encode('utf-8')).hexdigest()[:16]
+
+
+def export_path(region, year, scale, version):
+    key = hashlib.sha256(f'{version}|{region_hash(region)}|{scale}'.encode('utf-8')).hexdigest()[:16]
+    export_dir = os.environ.get(EXPORT_DIR_ENV, DEFAULT_EXPORT_DIR)
+    return os.path.join(export_dir, f'{region.key}_agb_{year}_{scale}m_{key}.tif')
+
+
+def _tile_request(image, transform, tile):
+    """getDownloadURL parameters for a tile and a key identifying its contents"""
+    tile_transform = transform * Affine.translation(tile.col_off, tile.row_off)
+    params = {
+        'crs': 'EPSG:4326',
+        'crs_transform': list(tile_transform)[:6],
+        'dimensions': f'{tile.width}x{tile.height}',
+        'format': 'GEO_TIFF',
+    }
+    key = hashlib.sha256(
+        (image.serialize() + json.dumps(params, sort_keys=True)).encode('utf-8')
+    ).hexdigest()
+    return params, key
+
+
+def export_agb_geotiff(region, year, scale=100):
+    """Clip agb_{year} to the region and mosaic it into one GeoTIFF, reusing earlier exports
+
+    Download URLs are requested one by one on the calling thread, since the
+    Earth Engine client's HTTP transport is not thread-safe; only the byte
+    fetches run in the pool. Each tile is written into its window of the
+    output as it completes, so the mosaic is never held in memory, though
+    tiles that arrive faster than they are written wait in a temp directory.
+    """
+    asset_id = region.asset(f'agb_{year}')
+    path = export_path(region, year, scale, asset_version(asset_id))
+    if os.path.exists(path):
+        return path
+
+    image = (
+        ee.Image(asset_id).select('agbd')
+        .clip(region.geometry(scale))
+        .toFloat()
+        .unmask(NODATA)
+    )
+    transform, width, height = export_grid(region.bbox, scale)
+    tiles = plan_tiles(width, height)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique per call: concurrent sessions exporting the same raster must not share a file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tif.part')
+    os.close(fd)
+    profile = {
+        'driver': 'GTiff',
+        'width': width,
+        'height': height,
+        'count': 1,
+        'dtype': 'float32',
+        'crs': 'EPSG:4326',
+        'transform': transform,
+        'nodata': NODATA,
+        'tiled': True,
+        'blockxsize': 512,
+        'blockysize': 512,
+        'compress': 'deflate',
+        'BIGTIFF': 'IF_SAFER',
+    }
+    try:
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp_dir, \
+                rasterio.open(tmp_path, 'w', **profile) as dst:
+            pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS)
+            try:
+                futures = {}
+                for tile in tiles:
+                    params, key = _tile_request(image, transform, tile)
+                    url = image.getDownloadURL(params)
+                    tile_path = os.path.join(tmp_dir, f'tile_{tile.row_off}_{tile.col_off}.tif')
+                    futures[pool.submit(download, url, tile_path, key, DOWNLOAD_TIMEOUT)] = tile
+                for future in as_completed(futures):
+                    tile = futures[future]
+                    tile_path = future.result()
+                    with rasterio.open(tile_path) as src:
+                        dst.write(src.read(1).astype(np.float32), 1, window=tile.window)
+                    os.remove(tile_path)
+            except BaseException:
+                # Surface the error now instead of after every queued tile
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            pool.shutdown()
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return path
+
+
+def stats_table(tables):
+    """Outer-join per-year DataFrames on year"""
+    frames = [df for df in tables if not df.empty]
+    if not frames:
+        return None
+    merged = frames[0]
+    for df in frames[1:]:
+        merged = merged.merge(df, on='year', how='outer')
+    return merged.sort_values('year').reset_index(drop=True)
+
+
+def to_csv_bytes(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def to_parquet_bytes(df):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
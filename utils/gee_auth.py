@@ -1,16 +1,23 @@
 import ee
 import streamlit as st
+from utils.ee_replay import REPLAY_PROJECT, make_transport, transport_mode
 
 @st.cache_data
 def auth_gee():
     """Authenticate Google Earth Engine using service account"""
     try:
+        mode = transport_mode()
+        if mode == 'replay':
+            # Recorded responses stand in for the network, no credentials needed
+            ee.Initialize(None, project=REPLAY_PROJECT, http_transport=make_transport(mode))
+            return True
+
         # Use Earth Engine's built-in service account authentication
         credentials = ee.ServiceAccountCredentials(
             st.secrets["gee_service_account"]["client_email"],
             key_data=st.secrets["gee_service_account"]["private_key"]
         )
-        ee.Initialize(credentials)
+        ee.Initialize(credentials, http_transport=make_transport(mode))
         return True
     except Exception as e:
         st.error(f"GEE Authentication Error: {str(e)}")
@@ -0,0 +1,296 @@
+import math
+
+import ee
+
+# Tolerances (meters) at which each region outline is pre-simplified
+SIMPLIFY_SCALES = (100, 500, 2000)
+
+# Max children per R-tree node
+RTREE_NODE_CAPACITY = 8
+
+METERS_PER_DEGREE = 111320
+
+
+class Region:
+    """Protected area monitored by the app
+
+    `center` (lat, lon) and `area_ha` should be the published figures. Without
+    them the bounding box center and a flat-earth shoelace area of the
+    outline are used; the area is only a rough estimate and follows the
+    drawn outline, e.g. ~594,800 ha for Tanjung Puting against the
+    published 400,000 ha.
+    """
+
+    def __init__(self, key, name, province, country, asset_root, coordinates, center=None, area_ha=None):
+        self.key = key
+        self.name = name
+        self.province = province
+        self.country = country
+        self.asset_root = asset_root
+        self.coordinates = [tuple(point) for point in coordinates]
+        self.bbox = _bbox(self.coordinates)
+        # Published figures take precedence over ones derived from the outline
+        self.center = tuple(center) if center is not None else _bbox_center(self.bbox)
+        self.area_ha = area_ha if area_ha is not None else _area_ha(self.coordinates)
+        self.simplified = {
+            scale: _simplify(self.coordinates, scale / METERS_PER_DEGREE)
+            for scale in SIMPLIFY_SCALES
+        }
+
+    def asset(self, name):
+        return f'{self.asset_root}/{name}'
+
+    def ring(self, scale=None):
+        """Outline coordinates, simplified to the coarsest level not exceeding `scale` meters"""
+        if scale is None:
+            return self.coordinates
+        levels = [s for s in SIMPLIFY_SCALES if s <= scale]
+        return self.simplified[max(levels)] if levels else self.coordinates
+
+    def geometry(self, scale=None):
+        return ee.Geometry.Polygon([[list(point) for point in self.ring(scale)]])
+
+    def contains(self, lon, lat):
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        if not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+            return False
+        return _point_in_ring(lon, lat, self.coordinates)
+
+
+class RegionRegistry:
+    """Named regions with an R-tree over their bounding boxes"""
+
+    def __init__(self):
+        self._regions = {}
+        self._index = None
+
+    def register(self, region):
+        if region.key in self._regions:
+            raise ValueError(f"Region '{region.key}' is already registered")
+        self._regions[region.key] = region
+        self._index = None
+        return region
+
+    def get(self, key):
+        try:
+            return self._regions[key]
+        except KeyError:
+            raise KeyError(f"Unknown region '{key}'") from None
+
+    def keys(self):
+        return list(self._regions)
+
+    def __iter__(self):
+        return iter(self._regions.values())
+
+    def __len__(self):
+        return len(self._regions)
+
+    def find(self, lon, lat):
+        """Return the first region containing the point, or None"""
+        if self._index is None:
+            self._index = _RTree([(r.bbox, r) for r in self._regions.values()])
+        for region in self._index.query(lon, lat):
+            if region.contains(lon, lat):
+                return region
+        return None
+
+
+class _RTree:
+    """Static R-tree bulk loaded with Sort-Tile-Recursive packing"""
+
+    def __init__(self, entries, capacity=RTREE_NODE_CAPACITY):
+        # A node is (bbox, children, item); leaves carry an item, inner nodes children
+        level = [(bbox, None, item) for bbox, item in entries]
+        while len(level) > capacity:
+            level = self._pack(level, capacity)
+        self.root = (_union([node[0] for node in level]), level, None) if level else None
+
+    @staticmethod
+    def _pack(nodes, capacity):
+        n_parents = math.ceil(len(nodes) / capacity)
+        n_slices = math.ceil(math.sqrt(n_parents))
+        slice_size = n_slices * capacity
+        nodes = sorted(nodes, key=lambda n: n[0][0] + n[0][2])
+        parents = []
+        for i in range(0, len(nodes), slice_size):
+            strip = sorted(nodes[i:i + slice_size], key=lambda n: n[0][1] + n[0][3])
+            for j in range(0, len(strip), capacity):
+                children = strip[j:j + capacity]
+                parents.append((_union([c[0] for c in children]), children, None))
+        return parents
+
+    def query(self, lon, lat):
+        if self.root is None:
+            return
+        stack = [self.root]
+        while stack:
+            (min_lon, min_lat, max_lon, max_lat), children, item = stack.pop()
+            if not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+                continue
+            if children is None:
+                yield item
+            else:
+                stack.extend(children)
+
+
+def _bbox(coordinates):
+    lons = [lon for lon, _ in coordinates]
+    lats = [lat for _, lat in coordinates]
+    return (min(lons), min(lats), max(lons), max(lats))
+
+
+def _bbox_center(bbox):
+    """(lat, lon) of the bounding box center, for map views"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return ((min_lat + max_lat) / 2, (min_lon + max_lon) / 2)
+
+
+def _union(bboxes):
+    return (
+        min(b[0] for b in bboxes),
+        min(b[1] for b in bboxes),
+        max(b[2] for b in bboxes),
+        max(b[3] for b in bboxes),
+    )
+
+
+def _area_ha(coordinates):
+    # Shoelace on an equirectangular projection, good enough at park scale
+    lat0 = math.radians(sum(lat for _, lat in coordinates) / len(coordinates))
+    kx = METERS_PER_DEGREE * math.cos(lat0)
+    ky = METERS_PER_DEGREE
+    area = 0.0
+    n = len(coordinates)
+    for i in range(n):
+        x1, y1 = coordinates[i]
+        x2, y2 = coordinates[(i + 1) % n]
+        area += (x1 * kx) * (y2 * ky) - (x2 * kx) * (y1 * ky)
+    return abs(area) / 2 / 10000
+
+
+def _point_in_ring(lon, lat, coordinates):
+    inside = False
+    n = len(coordinates)
+    for i in range(n):
+        x1, y1 = coordinates[i]
+        x2, y2 = coordinates[(i + 1) % n]
+        if (y1 > lat) != (y2 > lat):
+            if lon < x1 + (lat - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+    return inside
+
+
+def _segment_distance(point, start, end):
+    (px, py), (ax, ay), (bx, by) = point, start, end
+    dx, dy = bx - ax, by - ay
+    if dx == 0 and dy == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def _simplify(coordinates, tolerance):
+    """Douglas-Peucker on an open ring; keeps at least a triangle"""
+    n = len(coordinates)
+    if n <= 3:
+        return list(coordinates)
+    keep = [False] * n
+    keep[0] = keep[n - 1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_dist, index = 0.0, None
+        for i in range(first + 1, last):
+            dist = _segment_distance(coordinates[i], coordinates[first], coordinates[last])
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if index is not None and max_dist > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    simplified = [point for point, kept in zip(coordinates, keep) if kept]
+    if len(simplified) < 3:
+        return list(coordinates)
+    return simplified
+
+
+REGIONS = RegionRegistry()
+
+REGIONS.register(Region(
+    key='tanjung_puting',
+    name='Tanjung Puting National Park',
+    province='Central Kalimantan',
+    country='Indonesia',
+    asset_root='projects/ee-sorayatriutami/assets/agb',
+    center=(-3.05, 112.0435),
+    area_ha=400000,
+    coordinates=[
+        [111.88610442456644, -2.634969034682339],
+        [111.89125426587503, -2.655546449659222],
+        [111.90876372632425, -2.6850401460514184],
+        [111.89331420239847, -2.7049308420876907],
+        [111.89606078442972, -2.7176195640997145],
+        [111.88679107007425, -2.7258500152053013],
+        [111.89331420239847, -2.7601429536574984],
+        [111.86001189526957, -2.792034498640716],
+        [111.84730895337503, -2.7807182425493235],
+        [111.82430632886332, -2.791348668036572],
+        [111.78379424390238, -2.794091988050556],
+        [111.78001769360941, -2.800264434634048],
+        [111.79203398999613, -2.8174099487121724],
+        [111.785167534918, -2.838327133809131],
+        [111.75838836011332, -2.8379842321801423],
+        [111.75529845532816, -2.830097466660325],
+        [111.75941832837503, -2.8108946830231907],
+        [111.71272643384378, -2.77694613303973],
+        [111.70208342847269, -2.7790036488120053],
+        [111.70311339673441, -2.8095230435033094],
+        [111.72268279370707, -2.8225535537691324],
+        [111.7273823921613, -3.2221912287192493],
+        [111.61477252888005, -3.2194489851511228],
+        [111.62033831194752, -3.6005620583326463],
+        [112.19162737444752, -3.5950797206625347],
+        [112.19986712054127, -3.2420871034107583],
+        [112.3001173646819, -3.243458195531875],
+        [112.26990496233815, -3.207809198385169],
+        [112.25023871982027, -3.206395602312007],
+        [112.2571051748984, -3.176230053218437],
+        [112.2406256827109, -3.033617484950588],
+        [112.22002631747652, -2.892357644516766],
+        [112.18294746005465, -2.844352678960637],
+        [112.13788608216097, -2.7840007481915663],
+        [112.13033298157504, -2.7593104271303273],
+        [112.11385348938754, -2.759996276327663],
+        [112.04114594826174, -2.5469780477290866],
+        [112.02432313332034, -2.5469780477290866],
+        [111.95771851906252, -2.546292080361117],
+        [111.9505087412305, -2.5425192533115304],
+        [111.94398560890627, -2.547321031276085],
+        [111.9292227304883, -2.572358582696896],
+        [111.92973771461916, -2.576817273307101],
+        [111.92699113258791, -2.5783606625738598],
+        [111.9292227304883, -2.585563121046636],
+        [111.92441621193362, -2.5884783902399673],
+        [111.92613282570315, -2.591736624343633],
+        [111.9233862436719, -2.593965937582822],
+        [111.92544618019534, -2.597224157554991],
+        [111.9175497568555, -2.593451481030129],
+        [111.92098298439456, -2.599967915223642],
+        [111.91136994728518, -2.597567127589645],
+        [111.9123999155469, -2.6047694767833836],
+        [111.90484681496096, -2.602711666925904],
+        [111.90484681496096, -2.610599919778431],
+        [111.89523377785159, -2.614029579495644],
+        [111.89832368263674, -2.621917761255445],
+        [111.88768067726565, -2.6318636586595057],
+    ],
+))
+
+
+def get_region(key):
+    return REGIONS.get(key)
+
+
+def find_region(lon, lat):
+    return REGIONS.find(lon, lat)